@@ -1,7 +1,7 @@
 #!/usr/bin/env -S uv run --script
 # /// script
 # requires-python = ">=3.12"
-# dependencies = ["requests", "click", "rich"]
+# dependencies = ["requests", "click", "rich", "orjson"]
 # [tool.uv]
 # exclude-newer = "2025-06-06T00:00:00Z"
 # ///
@@ -22,13 +22,20 @@ Features:
 
 import os
 import sys
+import hashlib
 import json
+import re
+import shutil
 import subprocess
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Any
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import click
 from rich.console import Console
 from rich.table import Table
@@ -37,54 +44,185 @@ from rich.prompt import Confirm, Prompt
 from rich.panel import Panel
 from rich import print as rprint
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fall back to stdlib json
+
 # Configuration
 GRAFANA_URL = "https://throughputfocus.grafana.net"
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_DIR = SCRIPT_DIR.parent
 
+# Per-environment datasource (name, metrics URL) and dashboard definition files
+DATASOURCE_SETTINGS = {
+    'staging': ('Newsletter-API-Staging', 'https://api-staging.rnwolf.net/metrics'),
+    'production': ('Newsletter-API-Production', 'https://api.rnwolf.net/metrics')
+}
+DASHBOARD_FILES = {
+    'staging': PROJECT_DIR / 'grafana' / 'grafana-dashboard-config_staging.json',
+    'production': PROJECT_DIR / 'grafana' / 'grafana-dashboard-config_production.json'
+}
+
+# On-disk cache for the slow "list newsletter resources" scans, shared between runs
+CACHE_DIR = Path.home() / '.cache' / 'newsletter-grafana'
+CACHE_TTL = float(os.getenv('GRAFANA_CACHE_TTL', '60'))
+DISK_CACHED_ENDPOINTS = ('/api/search?query=newsletter&type=dash-db', '/api/serviceaccounts/search')
+
+# Case-insensitive match for newsletter resources, without lowercasing each name
+NEWSLETTER_RE = re.compile(r'newsletter', re.IGNORECASE)
+
 console = Console()
 
+def create_session() -> requests.Session:
+    """Create a pooled HTTP session shared by all API clients"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=50,
+        pool_maxsize=50,
+        # urllib3's default allowed_methods only retries idempotent requests; a retried
+        # POST could create a second service account, token or dashboard
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[500, 502, 503, 504]
+        )
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'Content-Type': 'application/json'})
+    return session
+
+def clear_disk_cache():
+    """Drop all cached scan results after Grafana state changes"""
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+def _substitute(obj: Any, needle: str, value: str) -> Any:
+    """Replace needle inside every string leaf of a JSON structure, in place"""
+    if isinstance(obj, dict):
+        for key, item in obj.items():
+            if isinstance(item, str):
+                if needle in item:
+                    obj[key] = item.replace(needle, value)
+            else:
+                _substitute(item, needle, value)
+    elif isinstance(obj, list):
+        for index, item in enumerate(obj):
+            if isinstance(item, str):
+                if needle in item:
+                    obj[index] = item.replace(needle, value)
+            else:
+                _substitute(item, needle, value)
+    return obj
+
+class ApiResult(NamedTuple):
+    """Outcome of a Grafana API call; unpacks as (ok, body)"""
+    ok: bool
+    body: Any
+
 class GrafanaAPI:
     """Wrapper for Grafana API calls with proper error handling"""
 
-    def __init__(self, api_key: str, base_url: str = GRAFANA_URL):
+    def __init__(self, api_key: str, session: Optional[requests.Session] = None, base_url: str = GRAFANA_URL,
+                 use_disk_cache: bool = False):
         self.api_key = api_key
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Authorization': f'Bearer {api_key}',
-            'Content-Type': 'application/json'
-        })
+        self.use_disk_cache = use_disk_cache
+        # The session may be shared between tokens, so auth is sent per request
+        self.session = session or create_session()
+        self._auth_header = f'Bearer {api_key}'
+        # Successful GET responses memoized per token for the lifetime of this client
+        self._cache: Dict[str, ApiResult] = {}
+        # Validators and bodies for conditional GETs (If-None-Match / 304)
+        self._etags: Dict[str, str] = {}
+        self._last_body: Dict[str, Any] = {}
+
+    def _request(self, method: str, endpoint: str, data: Optional[Dict] = None,
+                 parse_json: bool = True) -> ApiResult:
+        """Send a request to the Grafana API and return (success, body)"""
+        headers = {'Authorization': self._auth_header}
+        if method == 'GET' and endpoint in self._etags:
+            headers['If-None-Match'] = self._etags[endpoint]
+
+        # Serialize with orjson when available; Content-Type is set on the session
+        body = None if data is None else (orjson.dumps(data) if orjson else json.dumps(data))
 
-    def get(self, endpoint: str) -> Tuple[bool, Any]:
-        """Make GET request to Grafana API"""
         try:
-            response = self.session.get(f"{self.base_url}{endpoint}", timeout=30)
-            return response.status_code < 400, response.json() if response.content else {}
-        except Exception as e:
-            return False, {'error': str(e)}
+            response = self.session.request(method, f"{self.base_url}{endpoint}",
+                                            data=body, headers=headers, timeout=30)
+        except requests.RequestException as e:
+            return ApiResult(False, {'error': str(e)})
+
+        # Unchanged since the last scan: reuse the body we already parsed
+        if response.status_code == 304 and endpoint in self._last_body:
+            return ApiResult(True, self._last_body[endpoint])
+
+        if not parse_json:
+            return ApiResult(response.ok, None if response.ok else response.text)
 
-    def post(self, endpoint: str, data: Dict) -> Tuple[bool, Any]:
-        """Make POST request to Grafana API"""
         try:
-            response = self.session.post(f"{self.base_url}{endpoint}", json=data, timeout=30)
-            return response.status_code < 400, response.json() if response.content else {}
-        except Exception as e:
-            return False, {'error': str(e)}
+            result = response.json() if response.content else {}
+        except ValueError as e:
+            return ApiResult(False, {'error': str(e)})
+
+        etag = response.headers.get('ETag')
+        if method == 'GET' and response.ok and etag:
+            self._etags[endpoint] = etag
+            self._last_body[endpoint] = result
+        return ApiResult(response.ok, result)
+
+    def get(self, endpoint: str) -> ApiResult:
+        """Make GET request to Grafana API"""
+        if not (self.use_disk_cache and endpoint.startswith(DISK_CACHED_ENDPOINTS)):
+            return self._request('GET', endpoint)
+
+        # Key on a token fingerprint so different tokens never share results
+        token_hash = hashlib.sha256(self.api_key.encode()).hexdigest()[:8]
+        cache_key = hashlib.sha256(f"{token_hash}:{endpoint}".encode()).hexdigest()
+        cache_file = CACHE_DIR / f"{cache_key}.json"
 
-    def delete(self, endpoint: str) -> Tuple[bool, Any]:
-        """Make DELETE request to Grafana API"""
         try:
-            response = self.session.delete(f"{self.base_url}{endpoint}", timeout=30)
-            return response.status_code < 400, response.json() if response.content else {}
-        except Exception as e:
-            return False, {'error': str(e)}
+            if time.time() - cache_file.stat().st_mtime < CACHE_TTL:
+                return ApiResult(True, json.loads(cache_file.read_bytes()))
+        except (OSError, ValueError):
+            pass
+
+        result = self._request('GET', endpoint)
+        if result.ok:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            cache_file.write_text(json.dumps(result.body))
+        return result
+
+    def cached_get(self, endpoint: str) -> ApiResult:
+        """GET an idempotent endpoint, reusing an earlier successful response"""
+        if endpoint in self._cache:
+            return self._cache[endpoint]
+        result = self.get(endpoint)
+        if result.ok:
+            self._cache[endpoint] = result
+        return result
+
+    def cache_clear(self):
+        """Forget memoized responses after state-changing operations"""
+        self._cache.clear()
+
+    def post(self, endpoint: str, data: Dict) -> ApiResult:
+        """Make POST request to Grafana API"""
+        return self._request('POST', endpoint, data)
+
+    def delete(self, endpoint: str, parse_json: bool = True) -> ApiResult:
+        """Make DELETE request to Grafana API
+
+        With parse_json=False the body is only surfaced (as text) on failure.
+        """
+        return self._request('DELETE', endpoint, parse_json=parse_json)
 
 class GrafanaResetRebuild:
     """Main class for Grafana reset and rebuild operations"""
 
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
         self.console = console
+        self.use_cache = use_cache
         self.admin_api = None
         self.staging_api = None
         self.production_api = None
@@ -96,43 +234,48 @@ class GrafanaResetRebuild:
         self.production_token = os.getenv('GRAFANA_API_KEY_PRODUCTION')
         self.organization = os.getenv('GRAFANA_ORGANIZATION', 'throughputfocus')
 
+        # Worker pool for fanning out independent (I/O-bound) API calls
+        self.pool = ThreadPoolExecutor(max_workers=int(os.getenv('GRAFANA_CONCURRENCY', '20')))
+
+        # One pooled session so all API clients share TLS connections
+        self._session = create_session()
+
+        # Wrangler invocation; resolved to a concrete binary in check_prerequisites
+        self._wrangler_cmd = ['npx', 'wrangler']
+
         # Admin API for service account management
         if self.admin_token:
-            self.admin_api = GrafanaAPI(self.admin_token)
+            self.admin_api = self._api(self.admin_token)
 
         # Environment-specific APIs (if tokens exist)
         if self.staging_token:
-            self.staging_api = GrafanaAPI(self.staging_token)
+            self.staging_api = self._api(self.staging_token)
         if self.production_token:
-            self.production_api = GrafanaAPI(self.production_token)
+            self.production_api = self._api(self.production_token)
+
+    def _api(self, token: str) -> GrafanaAPI:
+        """Create an API client on the shared session"""
+        return GrafanaAPI(token, self._session, use_disk_cache=self.use_cache)
 
     def check_prerequisites(self) -> bool:
         """Check if all prerequisites are met"""
         rprint(Panel.fit("[bold blue]Checking Prerequisites[/bold blue]", border_style="blue"))
 
-        # Check required tools
-        tools = ['curl', 'npx']
-        for tool in tools:
-            if not self._command_exists(tool):
-                rprint(f"[red]❌ Required tool not found: {tool}[/red]")
-                return False
+        self._wrangler_cmd = self._resolve_wrangler()
 
-        # Check wrangler
-        try:
-            subprocess.run(['npx', 'wrangler', '--version'],
-                         capture_output=True, check=True, timeout=10)
-        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
-            rprint("[red]❌ Wrangler CLI not available[/red]")
-            return False
-
-        # Check project structure
-        if not (PROJECT_DIR / 'wrangler.jsonc').exists():
-            rprint("[red]❌ wrangler.jsonc not found[/red]")
-            return False
+        # The checks are independent; run them together and stop at the first failure
+        checks = {
+            self.pool.submit(self._command_exists, 'curl'): "Required tool not found: curl",
+            self.pool.submit(self._command_exists, 'npx'): "Required tool not found: npx",
+            self.pool.submit(self._wrangler_available): "Wrangler CLI not available",
+            self.pool.submit((PROJECT_DIR / 'wrangler.jsonc').exists): "wrangler.jsonc not found",
+            self.pool.submit((PROJECT_DIR / 'grafana').exists): "grafana/ directory not found",
+        }
 
-        if not (PROJECT_DIR / 'grafana').exists():
-            rprint("[red]❌ grafana/ directory not found[/red]")
-            return False
+        for future in as_completed(checks):
+            if not future.result():
+                rprint(f"[red]❌ {checks[future]}[/red]")
+                return False
 
         rprint("[green]✅ All prerequisites met[/green]")
         return True
@@ -152,7 +295,7 @@ class GrafanaResetRebuild:
             return False
 
         # Test admin API
-        success, user_info = self.admin_api.get('/api/user')
+        success, user_info = self.admin_api.cached_get('/api/user')
         if not success:
             rprint(f"[red]❌ Admin token authentication failed: {user_info}[/red]")
             return False
@@ -175,7 +318,7 @@ class GrafanaResetRebuild:
                     sa_name = login.split('-', 2)[2]  # Get the part after 'sa-{org_id}-'
 
                     # Search for this service account to get its role
-                    search_success, search_response = self.admin_api.get(f'/api/serviceaccounts/search?query={sa_name}')
+                    search_success, search_response = self.admin_api.cached_get(f'/api/serviceaccounts/search?query={sa_name}')
                     if search_success and 'serviceAccounts' in search_response:
                         for sa in search_response['serviceAccounts']:
                             if sa.get('login') == login or sa.get('name') == sa_name:
@@ -190,7 +333,7 @@ class GrafanaResetRebuild:
             rprint("[yellow]⚠️ Could not determine role from API, testing permissions directly...[/yellow]")
 
             # Test if we can perform admin actions (like listing service accounts)
-            test_success, test_response = self.admin_api.get('/api/serviceaccounts/search')
+            test_success, test_response = self.admin_api.cached_get('/api/serviceaccounts/search')
             if test_success:
                 rprint("[green]✅ Can list service accounts - appears to have admin permissions[/green]")
                 role = 'Admin'  # Assume admin if we can perform admin actions
@@ -208,7 +351,7 @@ class GrafanaResetRebuild:
         rprint(f"[green]✅ Admin service account: {login} (role: {role})[/green]")
 
         # Test service account management permissions
-        success, sa_list = self.admin_api.get('/api/serviceaccounts/search')
+        success, sa_list = self.admin_api.cached_get('/api/serviceaccounts/search')
         if not success:
             rprint(f"[red]❌ Cannot list service accounts: {sa_list}[/red]")
             return False
@@ -217,13 +360,13 @@ class GrafanaResetRebuild:
 
         # Check existing environment tokens (optional)
         if self.staging_api:
-            success, user_info = self.staging_api.get('/api/user')
+            success, user_info = self.staging_api.cached_get('/api/user')
             if success:
                 login = user_info.get('login', 'unknown')
                 rprint(f"[blue]ℹ️ Existing staging token: {login}[/blue]")
 
         if self.production_api:
-            success, user_info = self.production_api.get('/api/user')
+            success, user_info = self.production_api.cached_get('/api/user')
             if success:
                 login = user_info.get('login', 'unknown')
                 rprint(f"[blue]ℹ️ Existing production token: {login}[/blue]")
@@ -245,29 +388,36 @@ class GrafanaResetRebuild:
             rprint("[red]❌ No admin API available for scanning[/red]")
             return resources
 
+        # Issue the three scans concurrently
+        dashboards_future = self.pool.submit(self.admin_api.get, '/api/search?query=newsletter&type=dash-db')
+        datasources_future = self.pool.submit(self.admin_api.get, '/api/datasources')
+        sa_future = self.pool.submit(self.admin_api.get, '/api/serviceaccounts/search?query=newsletter')
+
+        is_newsletter = NEWSLETTER_RE.search
+
         # Get dashboards
-        success, dashboards = self.admin_api.get('/api/search?query=newsletter&type=dash-db')
+        success, dashboards = dashboards_future.result()
         if success and isinstance(dashboards, list):
             resources['dashboards'] = [
                 {'uid': d.get('uid'), 'title': d.get('title')}
-                for d in dashboards if 'newsletter' in d.get('title', '').lower()
+                for d in dashboards if is_newsletter(d.get('title', ''))
             ]
 
         # Get datasources
-        success, datasources = self.admin_api.get('/api/datasources')
+        success, datasources = datasources_future.result()
         if success and isinstance(datasources, list):
             resources['datasources'] = [
                 {'uid': d.get('uid'), 'name': d.get('name')}
-                for d in datasources if 'newsletter' in d.get('name', '').lower()
+                for d in datasources if is_newsletter(d.get('name', ''))
             ]
 
         # Get service accounts
-        success, sa_data = self.admin_api.get('/api/serviceaccounts/search?query=newsletter')
+        success, sa_data = sa_future.result()
         if success and 'serviceAccounts' in sa_data:
             resources['service_accounts'] = [
                 {'id': sa.get('id'), 'name': sa.get('name')}
                 for sa in sa_data['serviceAccounts']
-                if 'newsletter' in sa.get('name', '').lower()
+                if is_newsletter(sa.get('name', ''))
             ]
 
         # Display what we found
@@ -296,40 +446,20 @@ class GrafanaResetRebuild:
             rprint("[red]❌ No admin API available for cleanup[/red]")
             return False
 
-        success = True
+        # Collect (kind, endpoint, label) for everything to delete
+        deletions = []
 
-        # Delete dashboards
         for dashboard in resources['dashboards']:
-            uid = dashboard['uid']
-            title = dashboard['title']
-            rprint(f"[yellow]🗑️ Deleting dashboard: {title}[/yellow]")
-
-            delete_success, response = self.admin_api.delete(f'/api/dashboards/uid/{uid}')
-            if delete_success:
-                rprint(f"[green]✅ Deleted dashboard: {title}[/green]")
-            else:
-                rprint(f"[red]❌ Failed to delete dashboard: {title} - {response}[/red]")
-                success = False
+            deletions.append(('dashboard', f"/api/dashboards/uid/{dashboard['uid']}", dashboard['title']))
 
-        # Delete datasources
         for datasource in resources['datasources']:
-            uid = datasource['uid']
-            name = datasource['name']
-            rprint(f"[yellow]🗑️ Deleting datasource: {name}[/yellow]")
-
-            delete_success, response = self.admin_api.delete(f'/api/datasources/uid/{uid}')
-            if delete_success:
-                rprint(f"[green]✅ Deleted datasource: {name}[/green]")
-            else:
-                rprint(f"[red]❌ Failed to delete datasource: {name} - {response}[/red]")
-                success = False
+            deletions.append(('datasource', f"/api/datasources/uid/{datasource['uid']}", datasource['name']))
 
         # Delete service accounts (only in nuclear mode)
         if nuclear and resources['service_accounts']:
             rprint("[red]🚨 NUCLEAR MODE: Deleting service accounts[/red]")
 
             for sa in resources['service_accounts']:
-                sa_id = sa['id']
                 name = sa['name']
 
                 # Don't delete the admin service account we're using
@@ -337,17 +467,32 @@ class GrafanaResetRebuild:
                     rprint(f"[yellow]⚠️ Skipping admin service account: {name}[/yellow]")
                     continue
 
-                rprint(f"[yellow]🗑️ Deleting service account: {name}[/yellow]")
+                deletions.append(('service account', f"/api/serviceaccounts/{sa['id']}", name))
 
-                delete_success, response = self.admin_api.delete(f'/api/serviceaccounts/{sa_id}')
-                if delete_success:
-                    rprint(f"[green]✅ Deleted service account: {name}[/green]")
-                else:
-                    rprint(f"[red]❌ Failed to delete service account: {name} - {response}[/red]")
-                    success = False
+        for kind, _, label in deletions:
+            rprint(f"[yellow]🗑️ Deleting {kind}: {label}[/yellow]")
+
+        # Deletes are independent, so run them concurrently and report afterwards
+        results = self.pool.map(self._delete_one, deletions)
+
+        success = True
+        for (kind, _, label), (delete_success, response) in zip(deletions, results):
+            if delete_success:
+                rprint(f"[green]✅ Deleted {kind}: {label}[/green]")
+            else:
+                rprint(f"[red]❌ Failed to delete {kind}: {label} - {response}[/red]")
+                success = False
+
+        self.admin_api.cache_clear()
+        clear_disk_cache()
 
         return success
 
+    def _delete_one(self, deletion: Tuple[str, str, str]) -> ApiResult:
+        """Delete a single resource described by a (kind, endpoint, label) tuple"""
+        _, endpoint, _ = deletion
+        return self.admin_api.delete(endpoint, parse_json=False)
+
     def create_service_accounts_and_tokens(self) -> bool:
         """Create new service accounts and tokens for staging and production"""
         rprint(Panel.fit("[bold blue]Creating Service Accounts and Tokens[/bold blue]", border_style="blue"))
@@ -359,6 +504,10 @@ class GrafanaResetRebuild:
         environments = ['staging', 'production']
         success = True
 
+        # One timestamp for the whole run keeps token names and the token file in step
+        started = datetime.now()
+        timestamp = int(started.timestamp())
+
         for env in environments:
             rprint(f"[cyan]👤 Creating {env} service account...[/cyan]")
 
@@ -378,7 +527,7 @@ class GrafanaResetRebuild:
                     rprint(f"[yellow]⚠️ Service account {sa_name} already exists, finding it...[/yellow]")
 
                     # Find existing service account
-                    list_success, sa_list = self.admin_api.get(f'/api/serviceaccounts/search?query={sa_name}')
+                    list_success, sa_list = self.admin_api.cached_get(f'/api/serviceaccounts/search?query={sa_name}')
                     if list_success and 'serviceAccounts' in sa_list:
                         for sa in sa_list['serviceAccounts']:
                             if sa.get('name') == sa_name:
@@ -411,14 +560,17 @@ class GrafanaResetRebuild:
 
             tokens_success, tokens_response = self.admin_api.get(f'/api/serviceaccounts/{sa_id}/tokens')
             if tokens_success:
-                for token in tokens_response:
-                    token_id = token.get('id')
-                    if token_id:
-                        self.admin_api.delete(f'/api/serviceaccounts/{sa_id}/tokens/{token_id}')
-                        rprint(f"[yellow]🗑️ Deleted existing token: {token_id}[/yellow]")
+                token_ids = [token['id'] for token in tokens_response if token.get('id')]
+                # Token deletes are independent, so issue them concurrently
+                list(self.pool.map(
+                    lambda token_id: self.admin_api.delete(f'/api/serviceaccounts/{sa_id}/tokens/{token_id}', parse_json=False),
+                    token_ids
+                ))
+                for token_id in token_ids:
+                    rprint(f"[yellow]🗑️ Deleted existing token: {token_id}[/yellow]")
 
             # Create new token
-            token_name = f'newsletter-{env}-token-{int(time.time())}'
+            token_name = f'newsletter-{env}-token-{timestamp}'
             token_data = {'name': token_name}
 
             token_success, token_response = self.admin_api.post(f'/api/serviceaccounts/{sa_id}/tokens', token_data)
@@ -431,9 +583,9 @@ class GrafanaResetRebuild:
 
                     # Update API instances
                     if env == 'staging':
-                        self.staging_api = GrafanaAPI(new_token)
+                        self.staging_api = self._api(new_token)
                     elif env == 'production':
-                        self.production_api = GrafanaAPI(new_token)
+                        self.production_api = self._api(new_token)
                 else:
                     rprint(f"[red]❌ No token returned for {env}[/red]")
                     success = False
@@ -443,50 +595,54 @@ class GrafanaResetRebuild:
 
         if self.new_tokens:
             # Save tokens to file for reference
-            token_file = PROJECT_DIR / f".grafana-tokens-{datetime.now().strftime('%Y%m%d-%H%M%S')}.env"
-            with open(token_file, 'w') as f:
-                f.write("# New Grafana API Tokens\n")
-                f.write(f"# Generated: {datetime.now().isoformat()}\n\n")
-                for env, token in self.new_tokens.items():
-                    f.write(f"GRAFANA_API_KEY_{env.upper()}={token}\n")
+            token_file = PROJECT_DIR / f".grafana-tokens-{started:%Y%m%d-%H%M%S}.env"
+            # mkstemp creates the file owner-only (0600), so tokens are never world-readable. Swapping
+            # it into place also replaces a file left by an earlier run instead of failing after the
+            # tokens were already created on the server
+            fd, temp_name = tempfile.mkstemp(dir=PROJECT_DIR, prefix=".grafana-tokens-", suffix=".tmp")
+            payload = "".join(f"GRAFANA_API_KEY_{env.upper()}={token}\n" for env, token in self.new_tokens.items())
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(f"# New Grafana API Tokens\n# Generated: {started.isoformat()}\n\n{payload}")
+                os.replace(temp_name, token_file)
+            except BaseException:
+                Path(temp_name).unlink(missing_ok=True)
+                raise
 
             rprint(f"[green]💾 New tokens saved to: {token_file}[/green]")
 
+        self.admin_api.cache_clear()
+        clear_disk_cache()
+
         return success
 
+    def _live_envs(self, kind: str) -> Iterator[Tuple[str, GrafanaAPI, str]]:
+        """Yield (env, api, token) for environments that have a usable API client"""
+        for env, api, token in (
+            ('staging', self.staging_api, self.new_tokens.get('staging') or self.staging_token),
+            ('production', self.production_api, self.new_tokens.get('production') or self.production_token)
+        ):
+            if api:
+                yield env, api, token
+            else:
+                rprint(f"[yellow]⚠️ Skipping {env} {kind} (no API token)[/yellow]")
+
     def create_datasources(self) -> bool:
         """Create new datasources"""
         rprint(Panel.fit("[bold blue]Creating Datasources[/bold blue]", border_style="blue"))
 
-        datasource_configs = {
-            'staging': {
-                'name': 'Newsletter-API-Staging',
-                'url': 'https://api-staging.rnwolf.net/metrics',
-                'api_key': self.new_tokens.get('staging') or self.staging_token,
-                'api': self.staging_api
-            },
-            'production': {
-                'name': 'Newsletter-API-Production',
-                'url': 'https://api.rnwolf.net/metrics',
-                'api_key': self.new_tokens.get('production') or self.production_token,
-                'api': self.production_api
-            }
-        }
-
         success = True
 
-        for env, config in datasource_configs.items():
-            if not config['api']:
-                rprint(f"[yellow]⚠️ Skipping {env} datasource (no API token)[/yellow]")
-                continue
+        for env, api, api_key in self._live_envs('datasource'):
+            name, url = DATASOURCE_SETTINGS[env]
 
             rprint(f"[cyan]🔗 Creating {env} datasource...[/cyan]")
 
             datasource_data = {
-                'name': config['name'],
+                'name': name,
                 'type': 'prometheus',
                 'access': 'proxy',
-                'url': config['url'],
+                'url': url,
                 'isDefault': env == 'production',
                 'jsonData': {
                     'timeInterval': '30s',
@@ -494,12 +650,12 @@ class GrafanaResetRebuild:
                     'httpHeaderName1': 'Authorization'
                 },
                 'secureJsonData': {
-                    'httpHeaderValue1': f"Bearer {config['api_key']}"
+                    'httpHeaderValue1': f"Bearer {api_key}"
                 },
                 'editable': True
             }
 
-            create_success, response = config['api'].post('/api/datasources', datasource_data)
+            create_success, response = api.post('/api/datasources', datasource_data)
             if create_success:
                 ds_id = response.get('id', 'unknown')
                 rprint(f"[green]✅ Created {env} datasource (ID: {ds_id})[/green]")
@@ -513,48 +669,34 @@ class GrafanaResetRebuild:
         """Create new dashboards"""
         rprint(Panel.fit("[bold blue]Creating Dashboards[/bold blue]", border_style="blue"))
 
-        dashboard_configs = {
-            'staging': {
-                'file': PROJECT_DIR / 'grafana' / 'grafana-dashboard-config_staging.json',
-                'api': self.staging_api,
-                'token': self.new_tokens.get('staging') or self.staging_token
-            },
-            'production': {
-                'file': PROJECT_DIR / 'grafana' / 'grafana-dashboard-config_production.json',
-                'api': self.production_api,
-                'token': self.new_tokens.get('production') or self.production_token
-            }
-        }
-
         success = True
+        timestamp = int(time.time())
 
-        for env, config in dashboard_configs.items():
-            if not config['api'] or not config['file'].exists():
-                rprint(f"[yellow]⚠️ Skipping {env} dashboard (missing API or config file)[/yellow]")
+        for env, api, token in self._live_envs('dashboard'):
+            dashboard_file = DASHBOARD_FILES[env]
+            if not dashboard_file.exists():
+                rprint(f"[yellow]⚠️ Skipping {env} dashboard (missing config file)[/yellow]")
                 continue
 
             rprint(f"[cyan]📊 Creating {env} dashboard...[/cyan]")
 
             # Read and process dashboard config
-            with open(config['file'], 'r') as f:
-                dashboard_config = json.load(f)
+            with open(dashboard_file, 'rb') as f:
+                dashboard_config = orjson.loads(f.read()) if orjson else json.load(f)
 
             # Replace token placeholder
-            config_str = json.dumps(dashboard_config)
-            config_str = config_str.replace(f'glsa_YOUR_{env.upper()}_TOKEN_HERE', config['token'])
-            dashboard_config = json.loads(config_str)
+            _substitute(dashboard_config, f'glsa_YOUR_{env.upper()}_TOKEN_HERE', token)
 
             # Ensure fresh creation
             if 'dashboard' in dashboard_config:
                 dashboard_config['dashboard'].pop('id', None)
                 dashboard_config['dashboard'].pop('version', None)
                 # Generate unique UID
-                timestamp = int(time.time())
                 dashboard_config['dashboard']['uid'] = f'newsletter-{env}-{timestamp}'
 
             dashboard_config['overwrite'] = False
 
-            create_success, response = config['api'].post('/api/dashboards/db', dashboard_config)
+            create_success, response = api.post('/api/dashboards/db', dashboard_config)
             if create_success:
                 dashboard_url = response.get('url', '')
                 rprint(f"[green]✅ Created {env} dashboard[/green]")
@@ -570,35 +712,40 @@ class GrafanaResetRebuild:
         """Update Cloudflare Worker secrets with new tokens"""
         rprint(Panel.fit("[bold blue]Updating Cloudflare Secrets[/bold blue]", border_style="blue"))
 
-        success = True
-
-        for env, token in self.new_tokens.items():
+        for env in self.new_tokens:
             rprint(f"[cyan]🔐 Updating {env} Cloudflare secret...[/cyan]")
 
-            try:
-                # Use echo and pipe to wrangler
-                process = subprocess.Popen(
-                    ['npx', 'wrangler', 'secret', 'put', 'GRAFANA_API_KEY', '--env', env],
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    cwd=PROJECT_DIR
-                )
-
-                stdout, stderr = process.communicate(input=token, timeout=30)
-
-                if process.returncode == 0:
-                    rprint(f"[green]✅ Updated {env} Cloudflare secret[/green]")
-                else:
-                    rprint(f"[red]❌ Failed to update {env} secret: {stderr}[/red]")
-                    success = False
+        # Each env is an independent wrangler process, so run them side by side
+        futures = [self.pool.submit(self._put_secret, env, token) for env, token in self.new_tokens.items()]
 
-            except Exception as e:
-                rprint(f"[red]❌ Error updating {env} secret: {e}[/red]")
-                success = False
+        return all([future.result() for future in futures])
 
-        return success
+    def _put_secret(self, env: str, token: str) -> bool:
+        """Set GRAFANA_API_KEY for one environment via wrangler"""
+        try:
+            # Use echo and pipe to wrangler
+            process = subprocess.Popen(
+                [*self._wrangler_cmd, 'secret', 'put', 'GRAFANA_API_KEY', '--env', env],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                cwd=PROJECT_DIR,
+                env={**os.environ, 'NPM_CONFIG_UPDATE_NOTIFIER': 'false'}
+            )
+
+            stdout, stderr = process.communicate(input=token, timeout=30)
+
+            if process.returncode == 0:
+                rprint(f"[green]✅ Updated {env} Cloudflare secret[/green]")
+                return True
+
+            rprint(f"[red]❌ Failed to update {env} secret: {stderr}[/red]")
+            return False
+
+        except Exception as e:
+            rprint(f"[red]❌ Error updating {env} secret: {e}[/red]")
+            return False
 
     def test_integration(self) -> bool:
         """Test the complete integration"""
@@ -609,47 +756,68 @@ class GrafanaResetRebuild:
             'production': 'https://api.rnwolf.net'
         }
 
-        success = True
+        # Probe environments concurrently over the shared keep-alive session
+        targets = [(env, api_url) for env, api_url in test_configs.items() if env in self.new_tokens]
+        results = self.pool.map(lambda target: self._test_environment(*target), targets)
 
-        for env, api_url in test_configs.items():
-            if env not in self.new_tokens:
-                continue
+        return all(list(results))
 
-            rprint(f"[cyan]🧪 Testing {env} integration...[/cyan]")
+    def _test_environment(self, env: str, api_url: str) -> bool:
+        """Probe health and metrics endpoints for one environment"""
+        rprint(f"[cyan]🧪 Testing {env} integration...[/cyan]")
 
-            # Test API health
-            try:
-                response = requests.get(f"{api_url}/health", timeout=10)
-                if response.status_code == 200:
-                    rprint(f"[green]✅ {env} API health check passed[/green]")
-                else:
-                    rprint(f"[red]❌ {env} API health check failed[/red]")
-                    success = False
-            except Exception as e:
-                rprint(f"[red]❌ {env} API connection failed: {e}[/red]")
+        success = True
+
+        # Test API health
+        try:
+            response = self._session.get(f"{api_url}/health", timeout=10)
+            if response.status_code == 200:
+                rprint(f"[green]✅ {env} API health check passed[/green]")
+            else:
+                rprint(f"[red]❌ {env} API health check failed[/red]")
                 success = False
+        except Exception as e:
+            rprint(f"[red]❌ {env} API connection failed: {e}[/red]")
+            success = False
 
-            # Test metrics endpoint with authentication
-            try:
-                headers = {'Authorization': f'Bearer {self.new_tokens[env]}'}
-                response = requests.get(f"{api_url}/metrics", headers=headers, timeout=10)
-                if response.status_code == 200:
-                    rprint(f"[green]✅ {env} metrics endpoint accessible[/green]")
-                else:
-                    rprint(f"[yellow]⚠️ {env} metrics endpoint returned {response.status_code}[/yellow]")
-            except Exception as e:
-                rprint(f"[yellow]⚠️ {env} metrics test failed: {e}[/yellow]")
+        # Test metrics endpoint with authentication
+        try:
+            headers = {'Authorization': f'Bearer {self.new_tokens[env]}'}
+            response = self._session.get(f"{api_url}/metrics", headers=headers, timeout=10)
+            if response.status_code == 200:
+                rprint(f"[green]✅ {env} metrics endpoint accessible[/green]")
+            else:
+                rprint(f"[yellow]⚠️ {env} metrics endpoint returned {response.status_code}[/yellow]")
+        except Exception as e:
+            rprint(f"[yellow]⚠️ {env} metrics test failed: {e}[/yellow]")
 
         return success
 
-    def _command_exists(self, command: str) -> bool:
-        """Check if a command exists in PATH"""
+    def _wrangler_available(self) -> bool:
+        """Check that the resolved wrangler command runs"""
         try:
-            subprocess.run(['which', command], capture_output=True, check=True)
+            subprocess.run([*self._wrangler_cmd, '--version'],
+                         capture_output=True, check=True, timeout=10)
             return True
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError):
             return False
 
+    def _resolve_wrangler(self) -> List[str]:
+        """Locate the wrangler binary once so later calls skip npx resolution"""
+        local_bin = PROJECT_DIR / 'node_modules' / '.bin' / 'wrangler'
+        if local_bin.exists():
+            return [str(local_bin)]
+
+        global_bin = shutil.which('wrangler')
+        if global_bin:
+            return [global_bin]
+
+        return ['npx', 'wrangler']
+
+    def _command_exists(self, command: str) -> bool:
+        """Check if a command exists in PATH"""
+        return shutil.which(command) is not None
+
     def run_complete_reset(self, nuclear: bool = False, dry_run: bool = False) -> bool:
         """Run the complete reset and rebuild process"""
         rprint(Panel.fit(
@@ -730,10 +898,11 @@ class GrafanaResetRebuild:
 @click.option('--nuclear', is_flag=True, help='Delete service accounts too (DESTRUCTIVE)')
 @click.option('--dry-run', is_flag=True, help='Show what would be done without doing it')
 @click.option('--cleanup-only', is_flag=True, help='Only cleanup, no rebuild')
-def main(nuclear, dry_run, cleanup_only):
+@click.option('--no-cache', is_flag=True, help='Bypass the on-disk cache of Grafana scan results')
+def main(nuclear, dry_run, cleanup_only, no_cache):
     """Newsletter Grafana Integration - Complete Reset & Rebuild"""
 
-    reset_tool = GrafanaResetRebuild()
+    reset_tool = GrafanaResetRebuild(use_cache=not no_cache)
 
     if cleanup_only:
         # Just run cleanup
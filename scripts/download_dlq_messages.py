@@ -1,7 +1,7 @@
 #!/usr/bin/env -S uv run --script
 # /// script
 # requires-python = ">=3.12"
-# dependencies = ["requests"]
+# dependencies = ["requests", "orjson"]
 # [tool.uv]
 # exclude-newer = "2025-06-06T00:00:00Z"
 # ///
@@ -11,6 +11,14 @@ import os
 import requests
 import json
 import sys
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson parses large DLQ dumps several times faster; the stdlib parser is the fallback
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 # --- Configuration ---
 # Get these from your Cloudflare dashboard
@@ -43,6 +51,15 @@ headers = {
     "Content-Type": "application/json"
 }
 
+# One keep-alive session for all API calls, retrying rate limits and transient server errors
+SESSION = requests.Session()
+SESSION.headers.update(headers)
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+
 # --- Fetching Messages ---
 def fetch_dlq_messages():
     """Fetches messages from the specified Dead-Letter Queue."""
@@ -58,10 +75,10 @@ def fetch_dlq_messages():
     print(f"Attempting to fetch messages from DLQ: {QUEUE_NAME}...")
 
     try:
-        response = requests.get(QUEUE_API_URL, headers=headers, params=params)
+        response = SESSION.get(QUEUE_API_URL, params=params, timeout=(3.05, 30))
         response.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
 
-        data = response.json()
+        data = _json_loads(response.content)
 
         if data.get("success"):
             messages = data.get("result", [])
@@ -1,7 +1,7 @@
 #!/usr/bin/env -S uv run --script
 # /// script
 # requires-python = ">=3.12"
-# dependencies = ["requests"]
+# dependencies = ["requests", "orjson"]
 # [tool.uv]
 # exclude-newer = "2025-06-06T00:00:00Z"
 # ///
@@ -22,16 +22,24 @@ client = TinyJMAPClient(
 )
 account_id = client.get_account_id()
 
-# Here, we're going to find our drafts mailbox, by calling Mailbox/query
+# Here, we're going to find our drafts mailbox, by calling Mailbox/query, and
+# our sending identity, by calling Identity/get, in a single request. Back-
+# references only work on top-level method arguments, not inside the draft we
+# create below, so these lookups can't be folded into the sending request.
 query_res = client.make_jmap_call(
     {
-        "using": ["urn:ietf:params:jmap:core", "urn:ietf:params:jmap:mail"],
+        "using": [
+            "urn:ietf:params:jmap:core",
+            "urn:ietf:params:jmap:mail",
+            "urn:ietf:params:jmap:submission",
+        ],
         "methodCalls": [
             [
                 "Mailbox/query",
                 {"accountId": account_id, "filter": {"name": "Drafts"}},
                 "a",
-            ]
+            ],
+            ["Identity/get", {"accountId": account_id}, "i"],
         ],
     }
 )
@@ -40,6 +48,13 @@ query_res = client.make_jmap_call(
 draft_mailbox_id = query_res["methodResponses"][0][1]["ids"][0]
 assert len(draft_mailbox_id) > 0
 
+# Same for the identity matching our username
+identity_id = next(
+    identity["id"]
+    for identity in query_res["methodResponses"][1][1]["list"]
+    if identity["email"] == client.username
+)
+
 # Great! Now we're going to set up the data for the email we're going to send.
 body = """
 Hi!
@@ -64,8 +79,6 @@ draft = {
     "textBody": [{"partId": "body", "type": "text/plain"}],
 }
 
-identity_id = client.get_identity_id()
-
 # Here, we make two calls in a single request. The first is an Email/set, to
 # set our draft in our drafts folder, and the second is an
 # EmailSubmission/set, to actually send the mail to ourselves. This requires
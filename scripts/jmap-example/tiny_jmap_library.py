@@ -1,6 +1,12 @@
 import json
 import requests
 
+# orjson is several times faster at both ends; the stdlib is the fallback
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    _json_dumps, _json_loads = json.dumps, json.loads
+
 
 class TinyJMAPClient:
     """The tiniest JMAP client you can imagine."""
@@ -31,7 +37,7 @@ class TinyJMAPClient:
             },
         )
         r.raise_for_status()
-        self.session = session = r.json()
+        self.session = session = _json_loads(r.content)
         self.api_url = session["apiUrl"]
         return session
 
@@ -82,7 +88,7 @@ class TinyJMAPClient:
                 "Content-Type": "application/json",
                 "Authorization": f"Bearer {self.token}",
             },
-            data=json.dumps(call),
+            data=_json_dumps(call),
         )
         res.raise_for_status()
-        return res.json()
\ No newline at end of file
+        return _json_loads(res.content)
\ No newline at end of file
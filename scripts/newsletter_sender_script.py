@@ -10,6 +10,7 @@
 Newsletter Sender Script
 Features:
 - Rate limited email sending
+- Reused SMTP connections, optionally several in parallel (SEND_CONCURRENCY)
 - Restartable (tracks progress in CSV file)
 - Configurable SMTP settings
 - Error handling and logging
@@ -27,9 +28,15 @@ import hashlib
 import base64
 import sys
 import re
+import socket
+import threading
 import yaml
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from email import headerregistry, policy
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
 from datetime import datetime, timezone
 from pathlib import Path
 from urllib.parse import quote
@@ -46,13 +53,46 @@ FROM_EMAIL = os.getenv('FROM_EMAIL')
 FROM_NAME = os.getenv('FROM_NAME', 'Rudiger Wolf')
 BASE_URL = os.getenv('BASE_URL', 'https://api.rnwolf.net')
 BLOG_BASE_URL = os.getenv('BLOG_BASE_URL', 'https://www.rnwolf.net')
+# Domain for Message-ID; resolved once, as make_msgid() otherwise calls socket.getfqdn() per email
+MESSAGE_ID_DOMAIN = (FROM_EMAIL or '').rpartition('@')[2] or socket.getfqdn()
 
 # Rate limiting (emails per minute)
 EMAILS_PER_MINUTE = int(os.getenv('EMAILS_PER_MINUTE', '10'))
 DELAY_BETWEEN_EMAILS = 60 / EMAILS_PER_MINUTE
 
+# Parallel SMTP connections; sends still respect EMAILS_PER_MINUTE overall
+SEND_CONCURRENCY = max(1, int(os.getenv('SEND_CONCURRENCY', '1')))
+
+# Reconnect after this many emails; providers cap messages per connection
+MAX_EMAILS_PER_CONNECTION = int(os.getenv('MAX_EMAILS_PER_CONNECTION', '1000'))
+# Reconnect-and-retry attempts for a dropped connection or a transient 421/450, backing off 1s, 2s, 4s
+SMTP_RETRIES = 3
+TRANSIENT_SMTP_CODES = (421, 450)
+
+class _UnfoldedHeader(headerregistry.UnstructuredHeader):
+    """Header written on one line as-is
+
+    The default folder turns a List-Unsubscribe URL longer than a line into
+    RFC 2047 encoded-words, which breaks one-click unsubscribe. The URL is
+    ASCII and well under the 998 character line limit.
+    """
+
+    def fold(self, *, policy):
+        return f"{self.name}: {self}{policy.linesep}"
+
+_header_registry = headerregistry.HeaderRegistry()
+_header_registry.map_to_type('list-unsubscribe', _UnfoldedHeader)
+
+# CRLF and 7-bit clean bodies (no 8BITMIME needed). The line length is RFC 2045's 76 rather than
+# the default 78, because quoted-printable and base64 bodies are wrapped at exactly this width
+EMAIL_POLICY = policy.SMTP.clone(cte_type='7bit', max_line_length=76, header_factory=_header_registry)
+
 # File settings
 SUBSCRIBERS_FILE = "subscribers.csv"
+SUBSCRIBER_FIELDS = ['email', 'subscribed_at', 'ip_address', 'country', 'email_sent', 'sent_at', 'status']
+JOURNAL_FIELDS = ['email', 'email_sent', 'sent_at', 'status']
+# First journal line names the newsletter being sent: "# newsletter,<blog url>"
+JOURNAL_NEWSLETTER_KEY = '# newsletter'
 LOG_FILE = "newsletter.log"
 
 # Setup logging
@@ -65,17 +105,17 @@ logging.basicConfig(
     ]
 )
 
+# Keyed once at import; copying it per email skips re-deriving the HMAC key pads
+_UNSUBSCRIBE_HMAC = hmac.new(HMAC_SECRET_KEY.encode('utf-8'), digestmod=hashlib.sha256) if HMAC_SECRET_KEY else None
+
 def generate_unsubscribe_token(email):
     """Generate HMAC-SHA256 unsubscribe token"""
-    if not HMAC_SECRET_KEY:
+    if _UNSUBSCRIBE_HMAC is None:
         raise ValueError("HMAC_SECRET_KEY environment variable is required")
 
-    message = email.encode('utf-8')
-    token = hmac.new(
-        HMAC_SECRET_KEY.encode('utf-8'),
-        message,
-        hashlib.sha256
-    ).hexdigest()
+    mac = _UNSUBSCRIBE_HMAC.copy()
+    mac.update(email.encode('utf-8'))
+    token = mac.hexdigest()
     return base64.urlsafe_b64encode(token.encode()).decode().rstrip('=')
 
 def create_unsubscribe_url(email):
@@ -84,55 +124,144 @@ def create_unsubscribe_url(email):
     encoded_email = quote(email)
     return f"{BASE_URL}/v1/newsletter/unsubscribe?token={token}&email={encoded_email}"
 
+def iter_subscribers(filename=SUBSCRIBERS_FILE):
+    """Yield subscriber rows from the CSV file one at a time"""
+    with open(filename, 'r', newline='', encoding='utf-8') as csvfile:
+        yield from csv.DictReader(csvfile)
+
+def is_pending(subscriber):
+    """True if the newsletter has not been sent to this subscriber yet"""
+    return subscriber['email_sent'].lower() != 'true'
+
+def count_subscribers(filename=SUBSCRIBERS_FILE):
+    """Return (total, pending) counts, reading only the email_sent column"""
+    with open(filename, 'r', newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if header is None:
+            return 0, 0
+        # A plain reader with a fixed column index skips building a dict per row
+        sent_index = header.index('email_sent')
+        total = 0
+        pending = 0
+        for row in reader:
+            if not row:
+                continue
+            total += 1
+            pending += row[sent_index].lower() != 'true'
+    return total, pending
+
+def _journal_path(filename):
+    """Send results are appended here during a run, e.g. subscribers.journal.csv"""
+    return Path(filename).with_suffix('.journal.csv')
+
 def load_subscribers_from_file(filename=SUBSCRIBERS_FILE):
-    """Load subscribers from CSV file"""
-    if not Path(filename).exists():
+    """Load subscribers from CSV file, including results journaled by an unfinished run"""
+    # Open directly rather than stat first; a missing file is reported from the exception
+    try:
+        subscribers = list(iter_subscribers(filename))
+    except FileNotFoundError:
         logging.error(f"Subscribers file {filename} not found. Run subscriber_fetcher.py first.")
         return []
 
-    subscribers = []
-    with open(filename, 'r', newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            subscribers.append(row)
+    try:
+        journal = open(_journal_path(filename), 'r', newline='', encoding='utf-8')
+    except FileNotFoundError:
+        return subscribers
+
+    with journal:
+        by_email = {row['email']: row for row in subscribers}
+        for entry in csv.reader(journal):
+            # Skip the newsletter line and a line cut short by a crash; later entries win
+            if len(entry) == len(JOURNAL_FIELDS) and entry[0] in by_email:
+                by_email[entry[0]].update(zip(JOURNAL_FIELDS, entry))
 
     return subscribers
 
-def update_subscriber_status(filename, email, status='True', sent_time=None, error_msg=None):
-    """Update the email_sent status for a specific subscriber"""
-    if sent_time is None:
-        #sent_time = datetime.utcnow().isoformat()
-        sent_time = datetime.now(timezone.utc).isoformat()
+def _journal_newsletter(journal_path):
+    """The newsletter a journal was written for, from its first line; None if not recorded"""
+    with open(journal_path, 'r', newline='', encoding='utf-8') as journal:
+        first = next(csv.reader(journal), None)
+    if first and len(first) == 2 and first[0] == JOURNAL_NEWSLETTER_KEY:
+        return first[1]
+    return None
+
+def reconcile_status_journal(newsletter, filename=SUBSCRIBERS_FILE):
+    """Fold the send results journal into the subscribers CSV with one rewrite, then remove it
+
+    Returns False, leaving both files alone, if the journal belongs to another newsletter;
+    its sent rows would otherwise make this newsletter skip those subscribers.
+    """
+    journal_path = _journal_path(filename)
+    if not journal_path.exists():
+        return True
+    # Without the CSV there is nothing to fold into; keep the journal for when it is back
+    if not Path(filename).exists():
+        return True
 
+    journal_newsletter = _journal_newsletter(journal_path)
+    if journal_newsletter != newsletter:
+        logging.error(f"{journal_path} holds results for another newsletter ({journal_newsletter or 'unknown'}), "
+                      f"not {newsletter}. Finish that send or remove the journal first.")
+        return False
 
-    # Read all subscribers
-    subscribers = []
-    with open(filename, 'r', newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            if row['email'] == email:
-                row['email_sent'] = status
-                row['sent_at'] = sent_time
-                if error_msg:
-                    row['status'] = f'error: {error_msg[:100]}'  # Truncate long error messages
-                else:
-                    row['status'] = 'sent' if status == 'True' else 'pending'
-            subscribers.append(row)
-
-    # Write back to file
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['email', 'subscribed_at', 'ip_address', 'country', 'email_sent', 'sent_at', 'status']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    subscribers = load_subscribers_from_file(filename)
+
+    # Write a new file and swap it in, so an interruption never leaves a half-written CSV
+    temp_path = Path(filename).with_suffix('.csv.tmp')
+    with open(temp_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=SUBSCRIBER_FIELDS)
         writer.writeheader()
         writer.writerows(subscribers)
+    os.replace(temp_path, filename)
+    journal_path.unlink()
+    return True
+
+class StatusJournal:
+    """Append-only record of send results for one run
+
+    Rewriting the whole subscribers CSV after every email made a run O(N²) in
+    file I/O. Each result is appended here instead and flushed straight away,
+    so a crash loses nothing and a restart still skips subscribers already
+    sent; reconcile_status_journal folds it into the CSV once at the end.
+    """
+
+    def __init__(self, newsletter, filename=SUBSCRIBERS_FILE):
+        self.file = open(_journal_path(filename), 'a', newline='', encoding='utf-8', buffering=1 << 16)
+        self.writer = csv.writer(self.file)
+        if self.file.tell() == 0:
+            self.writer.writerow([JOURNAL_NEWSLETTER_KEY, newsletter])
+            self.file.flush()
+        # Send workers share one journal
+        self.lock = threading.Lock()
+
+    def record(self, email, status='True', sent_time=None, error_msg=None):
+        """Record the email_sent status for a specific subscriber"""
+        if sent_time is None:
+            sent_time = datetime.now(timezone.utc).isoformat()
+
+        if error_msg:
+            row_status = f'error: {error_msg[:100]}'  # Truncate long error messages
+        else:
+            row_status = 'sent' if status == 'True' else 'pending'
+
+        with self.lock:
+            self.writer.writerow([email, status, sent_time, row_status])
+            self.file.flush()
+
+    def close(self):
+        """Flush the journal to disk and close it"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
 
 def parse_markdown_file(file_path):
     """Parse markdown file and extract frontmatter and content"""
-    if not Path(file_path).exists():
-        raise FileNotFoundError(f"Markdown file not found: {file_path}")
-
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Markdown file not found: {file_path}") from None
 
     # Split frontmatter and content
     if content.startswith('---'):
@@ -169,16 +298,8 @@ def generate_blog_url(frontmatter):
     # Parse created date to extract year, month, day
     try:
         if isinstance(created, str):
-            # Try to parse various date formats
-            for fmt in ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%SZ']:
-                try:
-                    created_date = datetime.strptime(created, fmt)
-                    break
-                except ValueError:
-                    continue
-            else:
-                # If no format matches, try ISO format
-                created_date = datetime.fromisoformat(created.replace('Z', '+00:00'))
+            # fromisoformat covers YYYY-MM-DD, a space or 'T' before the time, and a 'Z' suffix
+            created_date = datetime.fromisoformat(created)
         else:
             created_date = created
 
@@ -196,9 +317,10 @@ def generate_blog_url(frontmatter):
 
     return blog_url
 
-def markdown_to_html(markdown_content):
-    """Convert markdown to HTML with proper extensions"""
-    md = markdown.Markdown(
+@cache
+def _markdown_converter():
+    """One configured Markdown instance; loading the extensions is the expensive part"""
+    return markdown.Markdown(
         extensions=[
             'codehilite',
             'fenced_code',
@@ -219,6 +341,11 @@ def markdown_to_html(markdown_content):
         }
     )
 
+def markdown_to_html(markdown_content):
+    """Convert markdown to HTML with proper extensions"""
+    md = _markdown_converter()
+    # Clear state such as footnotes and the TOC left over from a previous document
+    md.reset()
     html_content = md.convert(markdown_content)
     return html_content
 
@@ -226,10 +353,9 @@ def create_intro_text(subscription_date, blog_url, unsubscribe_url):
     """Create the intro text for both HTML and text versions"""
     # Format subscription date
     try:
-        if 'T' in subscription_date:
-            sub_date = datetime.fromisoformat(subscription_date.replace('Z', '+00:00'))
-        else:
-            sub_date = datetime.strptime(subscription_date, '%Y-%m-%d %H:%M:%S')
+        # Runs per subscriber; fromisoformat is far cheaper than strptime and takes both
+        # '2024-01-02 03:04:05' and ISO 8601 with a 'Z' suffix
+        sub_date = datetime.fromisoformat(subscription_date)
         formatted_date = sub_date.strftime("%B %d, %Y")
     except:
         formatted_date = subscription_date
@@ -253,118 +379,131 @@ Don't want to hear from me anymore? No problem — there's a one-click unsubscri
 
     return text_intro, html_intro
 
-def create_newsletter_email(email, subscription_date, markdown_file_path):
-    """Create newsletter email from markdown file with unsubscribe link"""
-    unsubscribe_url = create_unsubscribe_url(email)
-
-    # Parse markdown file
-    try:
-        frontmatter, markdown_content = parse_markdown_file(markdown_file_path)
-    except Exception as e:
-        logging.error(f"Error parsing markdown file: {e}")
-        raise
-
-    # Extract title for subject line
-    title = frontmatter.get('title', 'Newsletter Update')
-
-    # Generate blog URL
-    blog_url = generate_blog_url(frontmatter)
-
-    # Create intro text
-    text_intro, html_intro = create_intro_text(subscription_date, blog_url, unsubscribe_url)
-
-    # Convert markdown to HTML
-    html_content_body = markdown_to_html(markdown_content)
-
-    # Create text version (use original markdown)
-    text_content = text_intro + markdown_content + f"\n\n---\n\nUnsubscribe: {unsubscribe_url}\nVisit Website: {BLOG_BASE_URL}"
-
-    # Create HTML version with styling
-    html_content = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>{title}</title>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        body {{
+# Stylesheet for the HTML email; static, so kept out of the per-newsletter f-string
+NEWSLETTER_STYLE = """<style>
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', system-ui, sans-serif;
             line-height: 1.6;
             color: #333;
             max-width: 600px;
             margin: 0 auto;
             padding: 20px;
-        }}
-        .header {{
+        }
+        .header {
             border-bottom: 2px solid #eee;
             margin-bottom: 30px;
             padding-bottom: 20px;
-        }}
-        .content {{
+        }
+        .content {
             margin-bottom: 30px;
-        }}
-        .footer {{
+        }
+        .footer {
             border-top: 1px solid #eee;
             margin-top: 30px;
             padding-top: 20px;
             font-size: 14px;
             color: #666;
-        }}
-        a {{ color: #0066cc; text-decoration: none; }}
-        a:hover {{ text-decoration: underline; }}
-        h1, h2, h3, h4, h5, h6 {{ color: #2c5282; }}
-        h1 {{ margin: 0; }}
-        .subtitle {{ color: #666; margin: 5px 0 0 0; }}
-        blockquote {{
+        }
+        a { color: #0066cc; text-decoration: none; }
+        a:hover { text-decoration: underline; }
+        h1, h2, h3, h4, h5, h6 { color: #2c5282; }
+        h1 { margin: 0; }
+        .subtitle { color: #666; margin: 5px 0 0 0; }
+        blockquote {
             border-left: 4px solid #e2e8f0;
             margin: 1.5em 0;
             padding: 0.5em 1em;
             background: #f7fafc;
-        }}
-        code {{
+        }
+        code {
             background: #f1f5f9;
             padding: 2px 4px;
             border-radius: 3px;
             font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', monospace;
-        }}
-        pre {{
+        }
+        pre {
             background: #f8fafc;
             border: 1px solid #e2e8f0;
             border-radius: 5px;
             padding: 1em;
             overflow-x: auto;
-        }}
-        pre code {{
+        }
+        pre code {
             background: none;
             padding: 0;
-        }}
-        table {{
+        }
+        table {
             border-collapse: collapse;
             width: 100%;
             margin: 1em 0;
-        }}
-        th, td {{
+        }
+        th, td {
             border: 1px solid #e2e8f0;
             padding: 8px 12px;
             text-align: left;
-        }}
-        th {{
+        }
+        th {
             background: #f7fafc;
             font-weight: 600;
-        }}
-    </style>
+        }
+    </style>"""
+
+# The parts of a newsletter that are the same for every subscriber
+NewsletterTemplate = namedtuple('NewsletterTemplate', 'title blog_url markdown_content html_head html_content_body')
+
+def build_newsletter_template(markdown_file_path):
+    """Parse and render the newsletter markdown once for the whole run"""
+    # Parse markdown file
+    try:
+        frontmatter, markdown_content = parse_markdown_file(markdown_file_path)
+    except Exception as e:
+        logging.error(f"Error parsing markdown file: {e}")
+        raise
+
+    # Extract title for subject line
+    title = frontmatter.get('title', 'Newsletter Update')
+
+    # Generate blog URL
+    blog_url = generate_blog_url(frontmatter)
+
+    # Convert markdown to HTML
+    html_content_body = markdown_to_html(markdown_content)
+
+    # Page head, styling and header; everything up to the per-subscriber intro
+    html_head = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>{title}</title>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    {NEWSLETTER_STYLE}
 </head>
 <body>
     <div class="header">
         <h1>{title}</h1>
         <p class="subtitle">Rudiger's Wolf Newsletter</p>
     </div>
+"""
+
+    return NewsletterTemplate(title, blog_url, markdown_content, html_head, html_content_body)
+
+def create_newsletter_email(email, subscription_date, template):
+    """Create newsletter email for one subscriber from the pre-rendered template, with unsubscribe link"""
+    unsubscribe_url = create_unsubscribe_url(email)
+
+    # Create intro text
+    text_intro, html_intro = create_intro_text(subscription_date, template.blog_url, unsubscribe_url)
 
+    # Create text version (use original markdown)
+    text_content = text_intro + template.markdown_content + f"\n\n---\n\nUnsubscribe: {unsubscribe_url}\nVisit Website: {BLOG_BASE_URL}"
+
+    # Create HTML version with styling
+    html_content = f"""{template.html_head}
     {html_intro}
 
     <div class="content">
-        {html_content_body}
+        {template.html_content_body}
     </div>
 
     <div class="footer">
@@ -382,33 +521,91 @@ def create_newsletter_email(email, subscription_date, markdown_file_path):
 """
 
     # Create email message
-    msg = MIMEMultipart('alternative')
-    msg['Subject'] = title
+    msg = EmailMessage(policy=EMAIL_POLICY)
+    msg['Subject'] = template.title
     msg['From'] = f"{FROM_NAME} <{FROM_EMAIL}>"
     msg['To'] = email
+    msg['Date'] = formatdate(localtime=True)
+    msg['Message-ID'] = make_msgid(domain=MESSAGE_ID_DOMAIN)
     msg['List-Unsubscribe'] = f"<{unsubscribe_url}>"
     msg['List-Unsubscribe-Post'] = "List-Unsubscribe=One-Click"
 
     # Add text and HTML parts
-    text_part = MIMEText(text_content, 'plain', 'utf-8')
-    html_part = MIMEText(html_content, 'html', 'utf-8')
-
-    msg.attach(text_part)
-    msg.attach(html_part)
+    msg.set_content(text_content)
+    msg.add_alternative(html_content, subtype='html')
 
     return msg
 
-def send_email_smtp(msg, recipient_email):
-    """Send email via SMTP"""
-    try:
+def _is_transient_smtp_error(error):
+    """True for errors worth a reconnect and retry: a dropped connection or a 421/450 reply"""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code in TRANSIENT_SMTP_CODES for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code in TRANSIENT_SMTP_CODES
+
+class SMTPSession:
+    """One authenticated SMTP connection reused for every email in a run
+
+    Connecting, STARTTLS and login happen once instead of per email. The
+    connection is recycled every MAX_EMAILS_PER_CONNECTION emails, and if the
+    server drops it or answers 421/450 it is reopened and the send retried
+    with exponential backoff.
+    """
+
+    def __init__(self):
+        self.server = None
+        self.sent_on_connection = 0
+
+    def connect(self):
+        """Open and authenticate a new connection, replacing any current one"""
+        self.close()
         server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SMTP_USERNAME, SMTP_PASSWORD)
-
-        text = msg.as_string()
-        server.sendmail(FROM_EMAIL, recipient_email, text)
-        server.quit()
+        try:
+            server.starttls()
+            server.login(SMTP_USERNAME, SMTP_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+        self.server = server
+        self.sent_on_connection = 0
+
+    def send(self, msg, recipient_email):
+        """Send a message, reconnecting on the connection cap or a transient failure"""
+        data = msg.as_bytes()
+        if self.server is None:
+            self.connect()
+        elif self.sent_on_connection >= MAX_EMAILS_PER_CONNECTION:
+            logging.info(f"Sent {self.sent_on_connection} emails on this connection, reconnecting")
+            self.connect()
+
+        for attempt in range(SMTP_RETRIES + 1):
+            try:
+                self.server.sendmail(FROM_EMAIL, recipient_email, data)
+                break
+            except smtplib.SMTPException as e:
+                if attempt == SMTP_RETRIES or not _is_transient_smtp_error(e):
+                    raise
+                delay = 2 ** attempt
+                logging.warning(f"Transient SMTP failure ({e}), reconnecting in {delay}s")
+                time.sleep(delay)
+                self.connect()
+        self.sent_on_connection += 1
+
+    def close(self):
+        """Quit the current connection, if any"""
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except smtplib.SMTPException:
+            self.server.close()
+        self.server = None
 
+def send_email_smtp(smtp, msg, recipient_email):
+    """Send email via SMTP over an open SMTPSession"""
+    try:
+        smtp.send(msg, recipient_email)
         return True, "Email sent successfully"
 
     except Exception as e:
@@ -456,9 +653,16 @@ def show_status():
         print("No subscribers file found")
         return
 
+    # One pass: count sent rows and collect failed ones for the listing below
     total = len(subscribers)
-    sent = len([s for s in subscribers if s['email_sent'].lower() == 'true'])
-    failed = len([s for s in subscribers if s['status'].startswith('error')])
+    sent = 0
+    failed_subscribers = []
+    for sub in subscribers:
+        if not is_pending(sub):
+            sent += 1
+        if sub['status'].startswith('error'):
+            failed_subscribers.append(sub)
+    failed = len(failed_subscribers)
     pending = total - sent - failed
 
     print(f"\nNewsletter Status:")
@@ -469,9 +673,8 @@ def show_status():
 
     if failed > 0:
         print(f"\nFailed subscribers:")
-        for sub in subscribers:
-            if sub['status'].startswith('error'):
-                print(f"  {sub['email']}: {sub['status']}")
+        for sub in failed_subscribers:
+            print(f"  {sub['email']}: {sub['status']}")
 
 def send_newsletters():
     """Main function to send newsletters with rate limiting and restart capability"""
@@ -516,71 +719,172 @@ def send_newsletters():
                 print("Cancelled - not sending draft post")
                 return
 
+        # Render once; each subscriber's email only fills in its own intro and footer
+        template = build_newsletter_template(markdown_file_path)
+
     except Exception as e:
         logging.error(f"Error parsing markdown file: {e}")
         return
 
-    subscribers = load_subscribers_from_file()
-    if not subscribers:
+    # Results journaled by an interrupted run of this newsletter count as sent; fold them in first
+    if not reconcile_status_journal(template.blog_url, SUBSCRIBERS_FILE):
+        return
+
+    # Count in one streaming pass; the rows are read again, lazily, while sending
+    try:
+        total_subscribers, pending_count = count_subscribers(SUBSCRIBERS_FILE)
+    except FileNotFoundError:
+        logging.error(f"Subscribers file {SUBSCRIBERS_FILE} not found. Run subscriber_fetcher.py first.")
+        return
+    if not total_subscribers:
         logging.error("No subscribers found")
         return
 
-    total_subscribers = len(subscribers)
-    pending_subscribers = [s for s in subscribers if s['email_sent'].lower() != 'true']
-    sent_count = total_subscribers - len(pending_subscribers)
+    sent_count = total_subscribers - pending_count
 
     logging.info(f"Total subscribers: {total_subscribers}")
     logging.info(f"Already sent: {sent_count}")
-    logging.info(f"Pending: {len(pending_subscribers)}")
+    logging.info(f"Pending: {pending_count}")
 
-    if not pending_subscribers:
+    if not pending_count:
         logging.info("All newsletters have been sent!")
         return
 
     # Confirm before starting
-    response = input(f"\nSend newsletter '{title}' to {len(pending_subscribers)} subscribers? (y/N): ")
+    response = input(f"\nSend newsletter '{title}' to {pending_count} subscribers? (y/N): ")
     if response.lower() != 'y':
         logging.info("Newsletter sending cancelled")
         return
 
-    success_count = 0
-    error_count = 0
+    # Log in once up front; a bad password fails here instead of on every subscriber
+    sessions = []
+    try:
+        for _ in range(min(SEND_CONCURRENCY, pending_count)):
+            smtp = SMTPSession()
+            smtp.connect()
+            sessions.append(smtp)
+    except Exception as e:
+        logging.error(f"Could not connect to SMTP server {SMTP_SERVER}:{SMTP_PORT}: {e}")
+        for smtp in sessions:
+            smtp.close()
+        return
 
-    logging.info(f"Starting newsletter send with {DELAY_BETWEEN_EMAILS:.1f}s delay between emails")
+    logging.info(f"Starting newsletter send with {DELAY_BETWEEN_EMAILS:.1f}s delay between emails "
+                 f"over {len(sessions)} connection(s)")
 
-    for i, subscriber in enumerate(pending_subscribers, 1):
-        email = subscriber['email']
-        subscription_date = subscriber['subscribed_at']
+    journal = StatusJournal(template.blog_url, SUBSCRIBERS_FILE)
+    try:
+        pending_subscribers = filter(is_pending, iter_subscribers(SUBSCRIBERS_FILE))
+        send_to_subscribers(sessions, journal, pending_subscribers, pending_count, template)
+    finally:
+        for smtp in sessions:
+            smtp.close()
+        journal.close()
+        reconcile_status_journal(template.blog_url, SUBSCRIBERS_FILE)
+
+class RateLimiter:
+    """Spaces sends at least `interval` seconds apart across all worker threads"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self, stop):
+        """Block until this caller's send slot, or until `stop` is set; True if the slot was reached
+
+        The first caller goes immediately.
+        """
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            logging.info(f"Waiting {delay:.1f} seconds...")
+            return not stop.wait(delay)
+        return not stop.is_set()
+
+def send_to_subscriber(smtp, journal, subscriber, template):
+    """Send the newsletter to one subscriber and record the result in the CSV; True on success"""
+    email = subscriber['email']
+    subscription_date = subscriber['subscribed_at']
 
-        logging.info(f"Sending {i}/{len(pending_subscribers)} to {email}")
+    try:
+        # Create email from the pre-rendered newsletter
+        msg = create_newsletter_email(email, subscription_date, template)
 
-        try:
-            # Create email from markdown file
-            msg = create_newsletter_email(email, subscription_date, markdown_file_path)
-
-            # Send email
-            success, message = send_email_smtp(msg, email)
-
-            if success:
-                # Update status in CSV
-                update_subscriber_status(SUBSCRIBERS_FILE, email, 'True')
-                success_count += 1
-                logging.info(f"✓ Sent to {email}")
-            else:
-                error_count += 1
-                logging.error(f"✗ Failed to send to {email}: {message}")
-                # Mark as failed
-                update_subscriber_status(SUBSCRIBERS_FILE, email, 'Failed', error_msg=message)
-
-        except Exception as e:
+        # Send email
+        success, message = send_email_smtp(smtp, msg, email)
+
+        if success:
+            # Update status in CSV
+            journal.record(email, 'True')
+            logging.info(f"✓ Sent to {email}")
+            return True
+
+        logging.error(f"✗ Failed to send to {email}: {message}")
+        # Mark as failed
+        journal.record(email, 'Failed', error_msg=message)
+
+    except Exception as e:
+        logging.error(f"✗ Error sending to {email}: {str(e)}")
+        journal.record(email, 'Error', error_msg=str(e))
+
+    return False
+
+def _send_worker(smtp, journal, next_subscriber, limiter, stop, total, template):
+    """Send to subscribers from the shared source over one SMTP connection; returns (successes, errors)
+
+    Returns early once `stop` is set; a subscriber taken but not yet sent stays pending.
+    """
+    success_count = 0
+    error_count = 0
+    while True:
+        item = next_subscriber()
+        if item is None:
+            return success_count, error_count
+        i, subscriber = item
+
+        # Rate limiting is global, so EMAILS_PER_MINUTE holds however many workers run
+        if not limiter.wait(stop):
+            return success_count, error_count
+        logging.info(f"Sending {i}/{total} to {subscriber['email']}")
+        if send_to_subscriber(smtp, journal, subscriber, template):
+            success_count += 1
+        else:
             error_count += 1
-            logging.error(f"✗ Error sending to {email}: {str(e)}")
-            update_subscriber_status(SUBSCRIBERS_FILE, email, 'Error', error_msg=str(e))
 
-        # Rate limiting - wait between emails
-        if i < len(pending_subscribers):  # Don't wait after the last email
-            logging.info(f"Waiting {DELAY_BETWEEN_EMAILS:.1f} seconds...")
-            time.sleep(DELAY_BETWEEN_EMAILS)
+def send_to_subscribers(sessions, journal, pending_subscribers, total, template):
+    """Send the newsletter to every pending subscriber, one worker thread per SMTP session
+
+    pending_subscribers may be a lazy iterator; rows are pulled as workers need them.
+    """
+    work = enumerate(pending_subscribers, 1)
+    work_lock = threading.Lock()
+    limiter = RateLimiter(DELAY_BETWEEN_EMAILS)
+    # Set on Ctrl+C or a failed worker, so the others stop after their current email
+    stop = threading.Event()
+
+    def next_subscriber():
+        # Generators are not thread-safe, so workers take turns pulling the next row
+        with work_lock:
+            if stop.is_set():
+                return None
+            return next(work, None)
+
+    with ThreadPoolExecutor(max_workers=len(sessions)) as executor:
+        futures = [executor.submit(_send_worker, smtp, journal, next_subscriber, limiter, stop, total, template)
+                   for smtp in sessions]
+        try:
+            results = [future.result() for future in futures]
+        except BaseException:
+            # Leaving the with block waits for the workers, so they must stop first
+            stop.set()
+            raise
+
+    success_count = sum(successes for successes, _ in results)
+    error_count = sum(errors for _, errors in results)
 
     logging.info(f"\nNewsletter sending complete!")
     logging.info(f"Successful: {success_count}")
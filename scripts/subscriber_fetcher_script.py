@@ -1,7 +1,7 @@
 #!/usr/bin/env -S uv run --script
 # /// script
 # requires-python = ">=3.12"
-# dependencies = ["requests"]
+# dependencies = ["requests", "orjson"]
 # [tool.uv]
 # exclude-newer = "2025-06-06T00:00:00Z"
 # ///
@@ -14,108 +14,160 @@ import os
 import requests
 import csv
 import json
+import itertools
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
 import sys
 
+# orjson decodes the full subscriber result several times faster; the stdlib parser is the fallback
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 # Cloudflare API Configuration
 CLOUDFLARE_ACCOUNT_ID = os.getenv('CLOUDFLARE_ACCOUNT_ID')
 CLOUDFLARE_API_TOKEN = os.getenv('CLOUDFLARE_API_TOKEN')  # With D1:read permissions
 D1_DATABASE_ID = os.getenv('D1_DATABASE_ID')
 ENVIRONMENT = os.getenv('ENVIRONMENT')
 
+# Checked once by verify_environment() before any query is made
+REQUIRED_SETTINGS = {
+    'CLOUDFLARE_ACCOUNT_ID': CLOUDFLARE_ACCOUNT_ID,
+    'CLOUDFLARE_API_TOKEN': CLOUDFLARE_API_TOKEN,
+    'D1_DATABASE_ID': D1_DATABASE_ID,
+    'ENVIRONMENT': ENVIRONMENT,
+}
+
+D1_QUERY_URL = f"https://api.cloudflare.com/client/v4/accounts/{CLOUDFLARE_ACCOUNT_ID}/d1/database/{D1_DATABASE_ID}/query"
+
+# One keep-alive session for all D1 queries, so the TLS handshake is paid once per run.
+# The queries are read-only SELECTs, so rate limits and transient server errors are retried
+SESSION = requests.Session()
+SESSION.headers.update({
+    "Authorization": f"Bearer {CLOUDFLARE_API_TOKEN}",
+    "Content-Type": "application/json"
+})
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(["GET", "POST"])
+    )
+))
+
 # Valid environments
 VALID_ENVIRONMENTS = ['local', 'staging', 'production']
 
-def query_d1_database(sql_query):
-    """Execute SQL query against Cloudflare D1 database"""
-    if not all([CLOUDFLARE_ACCOUNT_ID, CLOUDFLARE_API_TOKEN, D1_DATABASE_ID]):
-        raise ValueError("Missing required environment variables: CLOUDFLARE_ACCOUNT_ID, CLOUDFLARE_API_TOKEN, D1_DATABASE_ID")
+# Columns of the CSV read by the newsletter sender script
+CSV_FIELDNAMES = ['email', 'subscribed_at', 'ip_address', 'country', 'email_sent', 'sent_at', 'status']
 
-    url = f"https://api.cloudflare.com/client/v4/accounts/{CLOUDFLARE_ACCOUNT_ID}/d1/database/{D1_DATABASE_ID}/query"
-
-    headers = {
-        "Authorization": f"Bearer {CLOUDFLARE_API_TOKEN}",
-        "Content-Type": "application/json"
-    }
+# Subscribers fetched per D1 query
+SUBSCRIBER_PAGE_SIZE = 5000
 
+def query_d1_database(sql_query, params=None):
+    """Execute SQL query against Cloudflare D1 database; call verify_environment() first"""
     payload = {
         "sql": sql_query
     }
+    if params:
+        payload["params"] = params
 
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
+        response = SESSION.post(D1_QUERY_URL, json=payload, timeout=30)
         response.raise_for_status()
-        return response.json()
+        return _json_loads(response.content)
     except requests.exceptions.RequestException as e:
         print(f"Error querying D1 database: {e}")
         raise
 
-def get_active_subscribers():
-    """Retrieve all active verified subscribers (those with subscribed_at, no unsubscribed_at, and email_verified = TRUE)"""
+def iter_active_subscriber_pages(page_size=SUBSCRIBER_PAGE_SIZE):
+    """Yield active verified subscribers (those with subscribed_at, no unsubscribed_at, and email_verified = TRUE) a page at a time
+
+    Each page continues after the last (subscribed_at, email) of the previous
+    one rather than using OFFSET, so subscribers sharing a timestamp are
+    neither skipped nor repeated and D1 never rescans earlier pages.
+    """
     query = """
-    SELECT email, subscribed_at, ip_address, country, email_verified, verified_at
+    SELECT email, subscribed_at, ip_address, country
     FROM subscribers
     WHERE subscribed_at IS NOT NULL
       AND unsubscribed_at IS NULL
       AND email_verified = TRUE
-    ORDER BY subscribed_at DESC
+      {after_cursor}
+    ORDER BY subscribed_at DESC, email
+    LIMIT ?
     """
-    return query_d1_database(query)
+    first_page = query.format(after_cursor="")
+    next_page = query.format(after_cursor="AND (subscribed_at < ? OR (subscribed_at = ? AND email > ?))")
+
+    params = [page_size]
+    sql = first_page
+    while True:
+        data = query_d1_database(sql, params)
+        if not data.get('success') or not data.get('result'):
+            raise RuntimeError(f"Error retrieving subscribers: {data}")
+
+        page = data['result'][0].get('results', [])
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+
+        last = page[-1]
+        params = [last['subscribed_at'], last['subscribed_at'], last['email'], page_size]
+        sql = next_page
+
+def iter_csv_rows(pages, countries):
+    """Yield a CSV row tuple per subscriber, tallying each country into `countries` on the way"""
+    for page in pages:
+        for subscriber in page:
+            country = subscriber.get('country', '')
+            countries[country or 'Unknown'] += 1
+            yield (subscriber['email'], subscriber['subscribed_at'], subscriber.get('ip_address', ''),
+                   country, 'False', '', 'pending')
 
 def save_subscribers_to_file(filename="subscribers.csv"):
     """Fetch subscribers from D1 and save to local CSV file"""
     print("Fetching subscribers from D1 database...")
 
     try:
-        subscribers_data = get_active_subscribers()
-
-        if not subscribers_data.get('success'):
-            print("Error retrieving subscribers:", subscribers_data)
-            return False
-
-        # Extract results from D1 response structure
-        results = subscribers_data.get('result', [])
-        if not results:
-            print("No data returned from database")
-            return False
-
-        subscribers = results[0].get('results', [])
-        print(f"Found {len(subscribers)} active subscribers")
-
-        if not subscribers:
+        pages = iter_active_subscriber_pages()
+        first_page = next(pages, None)
+        if first_page is None:
+            print("Found 0 active subscribers")
             print("No active subscribers found")
             return True
 
-        # Save to CSV file
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['email', 'subscribed_at', 'ip_address', 'country', 'email_sent', 'sent_at', 'status']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-            writer.writeheader()
-            for subscriber in subscribers:
-                writer.writerow({
-                    'email': subscriber['email'],
-                    'subscribed_at': subscriber['subscribed_at'],
-                    'ip_address': subscriber.get('ip_address', ''),
-                    'country': subscriber.get('country', ''),
-                    'email_sent': 'False',
-                    'sent_at': '',
-                    'status': 'pending'
-                })
-
+        # Rows flow from each page straight into the CSV, so memory holds one page rather than every subscriber.
+        # Write to a temporary file and swap it in, so a failed fetch leaves any previous CSV intact
+        temp_path = Path(filename).with_name(Path(filename).name + '.tmp')
+        countries = Counter()
+        try:
+            with open(temp_path, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(CSV_FIELDNAMES)
+                writer.writerows(iter_csv_rows(itertools.chain((first_page,), pages), countries))
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        os.replace(temp_path, filename)
+
+        total = countries.total()
+        print(f"Found {total} active subscribers")
         print(f"Subscribers saved to {filename}")
 
         # Show summary statistics
-        countries = {}
-        for sub in subscribers:
-            country = sub.get('country') or 'Unknown'
-            countries[country] = countries.get(country, 0) + 1
-
         print("\nSubscriber Summary:")
-        print(f"Total active subscribers: {len(subscribers)}")
+        print(f"Total active subscribers: {total}")
         print("\nBy country:")
-        for country, count in sorted(countries.items(), key=lambda x: x[1], reverse=True):
+        for country, count in countries.most_common():
             print(f"  {country}: {count}")
 
         return True
@@ -126,8 +178,7 @@ def save_subscribers_to_file(filename="subscribers.csv"):
 
 def verify_environment():
     """Verify all required environment variables are set and ENVIRONMENT is valid"""
-    required_vars = ['CLOUDFLARE_ACCOUNT_ID', 'CLOUDFLARE_API_TOKEN', 'D1_DATABASE_ID', 'ENVIRONMENT']
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
+    missing_vars = [var for var, value in REQUIRED_SETTINGS.items() if not value]
 
     if missing_vars:
         print("Missing required environment variables:")
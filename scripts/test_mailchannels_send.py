@@ -12,6 +12,8 @@ import json
 import sys
 import dns.resolver # For DNS TXT record lookup
 import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # --- Configuration ---
 MAILCHANNEL_API_KEY = os.environ.get("MAILCHANNEL_API_KEY")
@@ -64,6 +66,17 @@ headers = {
     "X-MailChannels-Auth-Id": MAILCHANNEL_AUTH_ID if MAILCHANNEL_AUTH_ID else None,
 }
 
+# Retry only 429 (honouring Retry-After): a rate-limited send was not accepted, whereas
+# retrying a 5xx could deliver the email twice. The final response is still reported below
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(max_retries=Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[429],
+    allowed_methods=frozenset(["POST"]),
+    raise_on_status=False
+)))
+
 payload = {
     "personalizations": [
         {
@@ -95,15 +108,12 @@ def check_domain_lockdown(domain: str):
     try:
         answers = dns.resolver.resolve(record_name, 'TXT')
         found_valid_record = False
-        for rdata in answers:
-            for txt_string in rdata.strings:
-                txt_value = txt_string.decode('utf-8')
-                print(f"  Found TXT record: {txt_value}")
-                if txt_value.lower().startswith("v=mc1"): # MailChannels records start with v=mc1
-                    found_valid_record = True
-                    break  # Exit inner loop
-            if found_valid_record:
-                break  # Exit outer loop
+        for txt_string in (s for rdata in answers for s in rdata.strings):
+            print(f"  Found TXT record: {txt_string.decode('utf-8', 'replace')}")
+            # Match on the raw bytes; MailChannels records start with v=mc1
+            if txt_string.lower().startswith(b"v=mc1"):
+                found_valid_record = True
+                break
 
         if found_valid_record:
             print("  Domain Lockdown TXT record appears to be configured correctly.")
@@ -125,7 +135,7 @@ def send_test_email():
     print(f"Using MailChannels API Key (first 5 chars): {MAILCHANNEL_API_KEY[:5]}...")
 
     try:
-        response = requests.post(MAILCHANNELS_API_URL, headers=headers, data=json.dumps(payload))
+        response = SESSION.post(MAILCHANNELS_API_URL, headers=headers, data=json.dumps(payload))
 
         if response.status_code == 202: # MailChannels returns 202 Accepted on success
             print("Successfully sent test email! MailChannels accepted the request.")
@@ -0,0 +1,119 @@
+"""Helpers in scripts/db-backup-restore.py that read and name backup files"""
+
+import gzip
+import importlib.util
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "db-backup-restore.py"
+
+
+@pytest.fixture(scope="module")
+def dbr():
+    spec = importlib.util.spec_from_file_location("db_backup_restore", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def large_gzip_backup(tmp_path):
+    """A gzip backup whose SQL is far larger than a pipe buffer (64 KiB)"""
+    header = "-- Newsletter Database Backup\n-- Environment: staging\n-- Dump Format: d1-export\n\n"
+    rows = "".join(f"INSERT INTO subscribers (email) VALUES ('user{i}@example.com');\n" for i in range(20000))
+    path = tmp_path / "backup-staging-20250101-120000.sql.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(header + rows)
+    return path
+
+
+@pytest.fixture
+def fake_pigz(tmp_path, monkeypatch, dbr):
+    """Route the pigz code path through gzip, which also dies of SIGPIPE when its reader goes away"""
+    gzip_bin = shutil.which("gzip")
+    if not gzip_bin:
+        pytest.skip("gzip binary not available")
+    script = tmp_path / "pigz"
+    script.write_text(f'#!/bin/sh\nexec {gzip_bin} "$@"\n')
+    script.chmod(0o755)
+    real_which = shutil.which
+    monkeypatch.setattr(dbr.shutil, "which", lambda name: str(script) if name == "pigz" else real_which(name))
+    return script
+
+
+@pytest.mark.parametrize("use_pigz", [False, True])
+def test_header_read_of_large_gzip_backup(dbr, large_gzip_backup, request, use_pigz):
+    if use_pigz:
+        request.getfixturevalue("fake_pigz")
+    elif shutil.which("pigz"):
+        pytest.skip("pigz is installed; the in-process gzip path is not used")
+
+    header = dbr._read_backup_header(large_gzip_backup)
+    assert header["Environment"] == "staging"
+    assert not dbr._is_incremental_backup(large_gzip_backup)
+
+
+def test_full_read_of_large_gzip_backup_with_pigz(dbr, large_gzip_backup, fake_pigz):
+    with dbr._open_backup_reader(large_gzip_backup) as f:
+        assert sum(1 for line in f if line.startswith("INSERT INTO")) == 20000
+
+
+def test_corrupt_gzip_backup_with_pigz_still_fails(dbr, tmp_path, fake_pigz):
+    path = tmp_path / "backup-staging-20250101-120000.sql.gz"
+    path.write_bytes(gzip.compress(b"-- header\nINSERT INTO t VALUES (1);\n")[:-8] + b"garbage!")
+    with pytest.raises(dbr.click.ClickException):
+        with dbr._open_backup_reader(path) as f:
+            f.read()
+
+
+def test_config_piped_output_with_null_id(dbr, monkeypatch):
+    from click.testing import CliRunner
+
+    monkeypatch.setattr(dbr, "DATABASE_CONFIG", {
+        "local": {"id": "local-db", "name": "newsletter-local", "remote": False},
+        "staging": {"id": None, "name": None, "remote": True},
+    })
+    result = CliRunner().invoke(dbr.cli, ["config"])
+    assert result.exit_code == 0, result.output
+    assert "staging\t❌ Not Set\tUnknown\tYes\t❌ Missing ID" in result.output
+
+
+@pytest.mark.parametrize("value, stored", [
+    (None, None),
+    (True, 1),
+    (-(2 ** 63), -(2 ** 63)),
+    (1.5, 1.5),
+    (float("inf"), float("inf")),
+    (float("-inf"), float("-inf")),
+    (float("nan"), None),
+    ("it's\r\nfine", "it's\r\nfine"),
+    (b"\x00ab'", b"\x00ab'"),
+    ([0, 255, 39], b"\x00\xff'"),
+])
+def test_sql_literal_round_trips_through_sqlite(dbr, value, stored):
+    with sqlite3.connect(":memory:") as conn:
+        assert conn.execute(f"SELECT {dbr._sql_literal(value)}").fetchone()[0] == stored
+
+
+@pytest.mark.parametrize("name, env, stamp", [
+    ("backup-staging-20250101-120000.sql.gz", "staging", "20250101-120000"),
+    ("backup-production-20250101-120000-incremental.sql.zst", "production", "20250101-120000-incremental"),
+    ("backup-local-20250101-120000-safety.sqlite", "local", "20250101-120000-safety"),
+    ("backup-local-20250101-120000.sql", "local", "20250101-120000"),
+])
+def test_backup_name_is_parsed(dbr, name, env, stamp):
+    match = dbr._BACKUP_NAME_RE.match(name)
+    assert match and (match["env"], match["stamp"]) == (env, stamp)
+
+
+@pytest.mark.parametrize("name", [
+    "backup-staging-old-20250101-120000.sql",  # hyphenated name that only starts with a configured one
+    "backup-dev-20250101-120000.sql",  # not a configured environment
+    "backup-staging-20250101.sql",
+    "backup-staging-20250101-120000-copy.sql",
+])
+def test_other_names_are_not_backups(dbr, name):
+    assert dbr._BACKUP_NAME_RE.match(name) is None
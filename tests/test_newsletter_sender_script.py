@@ -0,0 +1,123 @@
+"""Wire format of the emails built by scripts/newsletter_sender_script.py"""
+
+import email
+import importlib.util
+from email import policy
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("markdown")
+pytest.importorskip("yaml")
+
+SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "newsletter_sender_script.py"
+
+NEWSLETTER = """---
+title: Grüße aus dem Garten — a long title that needs more than one encoded word to fit
+slug: garden-notes
+date:
+  created: 2024-05-01
+---
+# Garden notes
+
+{paragraph}
+
+A line of ASCII that is much longer than seventy-six characters and has no non-ASCII at all in it, {tail}
+"""
+
+
+@pytest.fixture
+def sender(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # the script opens newsletter.log in the working directory
+    monkeypatch.setenv("HMAC_SECRET_KEY", "test-secret")
+    monkeypatch.setenv("FROM_EMAIL", "newsletter@example.org")
+    spec = importlib.util.spec_from_file_location("newsletter_sender_script", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def message(sender, tmp_path):
+    md_file = tmp_path / "post.md"
+    md_file.write_text(NEWSLETTER.format(paragraph="Schöne Grüße — “quoted” naïve café 😊 " * 20, tail="x" * 200),
+                       encoding="utf-8")
+    template = sender.build_newsletter_template(str(md_file))
+    msg = sender.create_newsletter_email("someone.with.a.long.address@example.org", "2024-01-02 03:04:05", template)
+    return sender, msg.as_bytes()
+
+
+def test_encoded_body_lines_fit_rfc_2045(message):
+    _, raw = message
+    parsed = email.message_from_bytes(raw, policy=policy.SMTP)
+    parts = [part for part in parsed.walk() if not part.is_multipart()]
+    assert [part.get_content_type() for part in parts] == ["text/plain", "text/html"]
+
+    for part in parts:
+        assert part["Content-Transfer-Encoding"] in ("7bit", "quoted-printable", "base64")
+        encoded = part.get_payload(decode=False)
+        for line in encoded.splitlines():
+            assert len(line) <= 76, (part.get_content_type(), len(line), line)
+
+
+def test_body_is_seven_bit_clean(message):
+    _, raw = message
+    raw.decode("ascii")
+
+
+def test_list_unsubscribe_header_is_one_plain_line(message):
+    sender, raw = message
+    url = sender.create_unsubscribe_url("someone.with.a.long.address@example.org")
+    assert f"\r\nList-Unsubscribe: <{url}>\r\n".encode("ascii") in raw
+
+
+def test_content_round_trips(message):
+    _, raw = message
+    parsed = email.message_from_bytes(raw, policy=policy.default)
+    assert parsed["Subject"].startswith("Grüße aus dem Garten")
+    text = parsed.get_body(("plain",)).get_content()
+    html = parsed.get_body(("html",)).get_content()
+    assert "Schöne Grüße — “quoted” naïve café 😊" in text
+    assert "Schöne Grüße" in html and "x" * 200 in html
+
+
+def _write_subscribers(path, *emails):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write("email,subscribed_at,ip_address,country,email_sent,sent_at,status\n")
+        for address in emails:
+            f.write(f"{address},2024-01-02 03:04:05,,,False,,pending\n")
+
+
+def test_journal_of_the_same_newsletter_is_folded_in(sender, tmp_path):
+    csv_path = tmp_path / "subscribers.csv"
+    _write_subscribers(csv_path, "a@example.org", "b@example.org")
+    journal = sender.StatusJournal("https://example.org/blog/one/", str(csv_path))
+    journal.record("a@example.org")
+    journal.close()
+
+    assert sender.reconcile_status_journal("https://example.org/blog/one/", str(csv_path))
+    assert not sender._journal_path(str(csv_path)).exists()
+    assert [sub["email_sent"] for sub in sender.iter_subscribers(str(csv_path))] == ["True", "False"]
+
+
+def test_journal_of_another_newsletter_is_refused(sender, tmp_path):
+    csv_path = tmp_path / "subscribers.csv"
+    _write_subscribers(csv_path, "a@example.org")
+    journal = sender.StatusJournal("https://example.org/blog/one/", str(csv_path))
+    journal.record("a@example.org")
+    journal.close()
+
+    assert not sender.reconcile_status_journal("https://example.org/blog/two/", str(csv_path))
+    assert sender._journal_path(str(csv_path)).exists()
+    assert [sub["email_sent"] for sub in sender.iter_subscribers(str(csv_path))] == ["False"]
+
+
+def test_journal_is_kept_when_subscribers_file_is_missing(sender, tmp_path):
+    csv_path = tmp_path / "subscribers.csv"
+    journal = sender.StatusJournal("https://example.org/blog/one/", str(csv_path))
+    journal.record("a@example.org")
+    journal.close()
+
+    assert sender.reconcile_status_journal("https://example.org/blog/one/", str(csv_path))
+    assert not csv_path.exists()
+    assert sender._journal_path(str(csv_path)).exists()